@@ -0,0 +1,48 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pesapal.utils import firebase_db, firestore, adjust_voucher_inventory
+
+
+class Command(BaseCommand):
+    help = "Import voucher codes from a CSV file (one code per row) and update the inventory counter."
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path")
+        parser.add_argument("--package", required=True)
+        parser.add_argument("--network", required=True)
+
+    def handle(self, *args, **options):
+        package = options["package"]
+        network = options["network"]
+
+        try:
+            with open(options["csv_path"], newline="") as f:
+                codes = [row[0].strip() for row in csv.reader(f) if row and row[0].strip()]
+        except OSError as e:
+            raise CommandError(f"Cannot read {options['csv_path']}: {e}")
+
+        imported = 0
+        counted = True
+        # Firestore batches are capped at 500 writes
+        for start in range(0, len(codes), 500):
+            batch = firebase_db.batch()
+            chunk = codes[start:start + 500]
+            for code in chunk:
+                batch.set(firebase_db.collection("vouchers").document(), {
+                    "code": code,
+                    "package": package,
+                    "network": network,
+                    "status": "available",
+                    "created_at": firestore.SERVER_TIMESTAMP,
+                })
+            batch.commit()
+            counted = adjust_voucher_inventory(package, network, len(chunk)) and counted
+            imported += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Imported {imported} vouchers for {package}/{network}"))
+        if imported and not counted:
+            self.stdout.write(self.style.WARNING(
+                "⚠️ Inventory counter not updated; run rebuild_voucher_inventory to recount"
+            ))
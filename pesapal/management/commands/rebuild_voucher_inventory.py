@@ -0,0 +1,62 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from pesapal.utils import firebase_db, firestore, voucher_inventory_key, VOUCHER_INVENTORY_SHARDS
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount available vouchers per package/network and reset the sharded inventory counters. "
+        "The count and the reset are not atomic: run it with no imports or payments in flight."
+    )
+
+    def handle(self, *args, **options):
+        counts = Counter()
+        skipped = 0
+        vouchers = firebase_db.collection("vouchers").where("status", "==", "available").stream()
+        for doc in vouchers:
+            data = doc.to_dict() or {}
+            package, network = data.get("package"), data.get("network")
+            if not package or not network:
+                skipped += 1
+                continue
+            counts[(package, network)] += 1
+
+        # Zero out counters for pairs that no longer have any available vouchers,
+        # and drop counters stored under an outdated document id
+        for doc in firebase_db.collection("voucher_inventory").stream():
+            data = doc.to_dict() or {}
+            package, network = data.get("package"), data.get("network")
+            if package and network:
+                counts.setdefault((package, network), 0)
+            if not package or not network or doc.id != voucher_inventory_key(package, network):
+                batch = firebase_db.batch()
+                for shard in doc.reference.collection("shards").stream():
+                    batch.delete(shard.reference)
+                batch.delete(doc.reference)
+                batch.commit()
+
+        for (package, network), total in counts.items():
+            inventory_ref = firebase_db.collection("voucher_inventory").document(
+                voucher_inventory_key(package, network)
+            )
+            batch = firebase_db.batch()
+            batch.set(inventory_ref, {
+                "package": package,
+                "network": network,
+                "num_shards": VOUCHER_INVENTORY_SHARDS,
+                "rebuilt_at": firestore.SERVER_TIMESTAMP,
+                "updated_at": firestore.SERVER_TIMESTAMP,
+            })
+            for shard in inventory_ref.collection("shards").stream():
+                if shard.id != "0":
+                    batch.delete(shard.reference)
+            batch.set(inventory_ref.collection("shards").document("0"), {"count": total})
+            batch.commit()
+
+            self.stdout.write(f"🎟️ {package}/{network}: {total} available")
+
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"⚠️ Skipped {skipped} vouchers missing package or network"))
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt inventory for {len(counts)} package/network pairs"))
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pesapal.utils import firebase_db, firestore, summarize_zenopay_response, archive_zenopay_payload
+
+RAW_FIELDS = {"zenopay_response": "initiate", "error": "initiate_error"}
+
+
+class Command(BaseCommand):
+    help = "Move raw Zenopay payloads off transaction documents into the zenopay_payloads archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+
+        # Each slimmed document costs two writes (archive + update); Firestore caps batches at 500
+        if not 0 < batch_size <= 250:
+            raise CommandError("--batch-size must be between 1 and 250")
+
+        scanned = slimmed = 0
+        last_doc = None
+
+        while True:
+            query = firebase_db.collection("transactions").order_by("__name__").limit(batch_size)
+            if last_doc is not None:
+                query = query.start_after(last_doc)
+            docs = list(query.stream())
+            if not docs:
+                break
+
+            batch = firebase_db.batch()
+            pending = 0
+            for doc in docs:
+                scanned += 1
+                data = doc.to_dict() or {}
+                raw_fields = [field for field in RAW_FIELDS if field in data]
+                if not raw_fields:
+                    continue
+
+                update_data = {}
+                for field in raw_fields:
+                    archive_zenopay_payload(doc.id, RAW_FIELDS[field], data[field], batch=batch)
+                    update_data.update(summarize_zenopay_response(data[field]))
+                    update_data[field] = firestore.DELETE_FIELD
+                batch.update(doc.reference, update_data)
+                pending += 1
+
+            if pending and not dry_run:
+                batch.commit()
+            slimmed += pending
+            last_doc = docs[-1]
+
+            self.stdout.write(f"📦 Scanned {scanned}, slimmed {slimmed}")
+
+        action = "Would slim" if dry_run else "Slimmed"
+        self.stdout.write(self.style.SUCCESS(f"✅ {action} {slimmed} of {scanned} transactions"))
@@ -1,3 +1,175 @@
-from django.test import TestCase
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+
+# 🔑 Firebase is initialized at import time; keep tests off the real SDK
+mock.patch("firebase_admin.initialize_app").start()
+mock.patch("firebase_admin.firestore.client").start()
+
+from pesapal import utils, views  # noqa: E402
+from pesapal.management.commands import slim_transactions  # noqa: E402
+
+
+class VoucherInventoryKeyTests(SimpleTestCase):
+    def test_key_is_a_valid_document_id(self):
+        key = utils.voucher_inventory_key("1/day", "__tigo__")
+        self.assertNotIn("/", key)
+        self.assertFalse(key.startswith("__"))
+
+    def test_pairs_do_not_collide(self):
+        self.assertNotEqual(
+            utils.voucher_inventory_key("a__b", "c"),
+            utils.voucher_inventory_key("a", "b__c"),
+        )
+
+
+class InitiateSoldOutTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.payload = {"phone": "0744963858", "amount": "1000", "package": "daily", "network": "tigo"}
+
+        self.db = mock.patch.object(views, "db").start()
+        self.post = mock.patch.object(views.requests, "post").start()
+        self.post.return_value.status_code = 200
+        self.post.return_value.json.return_value = {"status": "success", "resultcode": "000"}
+        mock.patch.object(views, "archive_zenopay_payload").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def initiate(self):
+        request = self.factory.post("/api/zenopay/initiate/", self.payload, format="json")
+        return views.initiate_zenopay_payment(request)
+
+    def test_sold_out_returns_409_without_writing(self):
+        mock.patch.object(views, "get_voucher_inventory", return_value=0).start()
+        mock.patch.object(views, "has_available_voucher", return_value=False).start()
+
+        response = self.initiate()
+
+        self.assertEqual(response.status_code, 409)
+        self.db.collection.assert_not_called()
+        self.post.assert_not_called()
+
+    def test_drifted_counter_allows_payment(self):
+        mock.patch.object(views, "get_voucher_inventory", return_value=0).start()
+        mock.patch.object(views, "has_available_voucher", return_value=True).start()
+
+        response = self.initiate()
+
+        self.assertEqual(response.status_code, 200)
+        self.post.assert_called_once()
+
+    def test_unbuilt_counter_allows_payment(self):
+        mock.patch.object(views, "get_voucher_inventory", return_value=None).start()
+        has_voucher = mock.patch.object(views, "has_available_voucher").start()
+
+        response = self.initiate()
+
+        self.assertEqual(response.status_code, 200)
+        has_voucher.assert_not_called()
+
+    def test_inventory_error_fails_open(self):
+        mock.patch.object(views, "get_voucher_inventory", side_effect=RuntimeError("unavailable")).start()
+
+        response = self.initiate()
+
+        self.assertEqual(response.status_code, 200)
+        self.post.assert_called_once()
+
+
+class SummarizeZenopayResponseTests(SimpleTestCase):
+    def test_keeps_only_normalized_fields(self):
+        summary = utils.summarize_zenopay_response({
+            "status": "success",
+            "resultcode": "000",
+            "message": "Request in progress",
+            "order_id": "abc",
+            "extra": {"nested": True},
+        })
+        self.assertEqual(summary, {
+            "zenopay_status": "success",
+            "zenopay_resultcode": "000",
+            "zenopay_message": "Request in progress",
+        })
+
+    def test_drops_missing_fields_and_non_dict_payloads(self):
+        self.assertEqual(utils.summarize_zenopay_response({"raw_response": "<html>"}), {})
+        self.assertEqual(utils.summarize_zenopay_response("oops"), {})
+
+
+class QueryZenopayStatusTests(SimpleTestCase):
+    def setUp(self):
+        mock.patch.object(utils, "firebase_db").start()
+        get = mock.patch.object(utils.requests, "get").start()
+        get.return_value.json.return_value = {
+            "result": "SUCCESS",
+            "data": [{"payment_status": "COMPLETED", "transid": "T1", "channel": "TZ-TIGO"}],
+        }
+        self.addCleanup(mock.patch.stopall)
+
+    def test_details_omitted_by_default(self):
+        result = utils.query_zenopay_payment_status("order-1")
+        self.assertEqual(result["status"], "COMPLETED")
+        self.assertNotIn("details", result)
+
+    def test_details_included_on_request(self):
+        result = utils.query_zenopay_payment_status("order-1", include_details=True)
+        self.assertEqual(result["details"][0]["transid"], "T1")
+
+
+class SlimTransactionsCommandTests(SimpleTestCase):
+    def setUp(self):
+        self.db = mock.patch.object(slim_transactions, "firebase_db").start()
+        self.archive = mock.patch.object(slim_transactions, "archive_zenopay_payload").start()
+        self.addCleanup(mock.patch.stopall)
+
+        self.query = mock.MagicMock()
+        self.query.start_after.return_value = self.query
+        self.db.collection.return_value.order_by.return_value.limit.return_value = self.query
+        self.batch = self.db.batch.return_value
+
+    def make_doc(self, doc_id, data):
+        doc = mock.MagicMock(id=doc_id)
+        doc.to_dict.return_value = data
+        return doc
+
+    def run_command(self, pages, **options):
+        self.query.stream.side_effect = [iter(page) for page in pages + [[]]]
+        call_command("slim_transactions", stdout=StringIO(), **options)
+
+    def test_pages_through_transactions_and_slims_raw_fields(self):
+        success = self.make_doc("a", {"status": "PENDING", "zenopay_response": {"status": "success"}})
+        failure = self.make_doc("b", {"status": "FAILED", "error": {"message": "Bad channel"}})
+        slim = self.make_doc("c", {"status": "COMPLETED"})
+
+        self.run_command([[success, failure], [slim]], batch_size=2)
+
+        self.query.start_after.assert_has_calls([mock.call(failure), mock.call(slim)])
+        self.assertEqual(self.batch.commit.call_count, 1)
+        self.archive.assert_has_calls([
+            mock.call("a", "initiate", {"status": "success"}, batch=self.batch),
+            mock.call("b", "initiate_error", {"message": "Bad channel"}, batch=self.batch),
+        ])
+        self.batch.update.assert_has_calls([
+            mock.call(success.reference, {
+                "zenopay_status": "success",
+                "zenopay_response": slim_transactions.firestore.DELETE_FIELD,
+            }),
+            mock.call(failure.reference, {
+                "zenopay_message": "Bad channel",
+                "error": slim_transactions.firestore.DELETE_FIELD,
+            }),
+        ])
+
+    def test_dry_run_does_not_commit(self):
+        doc = self.make_doc("a", {"zenopay_response": {"status": "success"}})
+
+        self.run_command([[doc]], dry_run=True)
+
+        self.batch.commit.assert_not_called()
+
+    def test_rejects_oversized_batches(self):
+        with self.assertRaises(slim_transactions.CommandError):
+            call_command("slim_transactions", batch_size=500, stdout=StringIO())
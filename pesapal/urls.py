@@ -1,10 +1,11 @@
 from django.urls import path
-from .views import initiate_zenopay_payment, zenopay_webhook, check_zenopay_status, reset_password
+from .views import initiate_zenopay_payment, zenopay_webhook, check_zenopay_status, reset_password, voucher_inventory
 
 urlpatterns = [
     path("zenopay/initiate/", initiate_zenopay_payment),
     path("zenopay/webhook/", zenopay_webhook),
     path("zenopay/status/<str:order_id>/", check_zenopay_status),
+    path("vouchers/inventory/", voucher_inventory),
     path('reset-password/', reset_password),
 
 ]
\ No newline at end of file
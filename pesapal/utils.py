@@ -1,5 +1,8 @@
 import os
 import json
+import random
+import hashlib
+import zlib
 import requests
 import firebase_admin
 from firebase_admin import credentials, firestore
@@ -19,6 +22,42 @@ if not firebase_admin._apps:
         print("⚠️ FIREBASE_KEY not found in environment variables.")
 firebase_db = firestore.client()
 
+def summarize_zenopay_response(response_data):
+    """
+    ✅ Keep only the normalized fields of a raw Zenopay response
+    for storage on the hot transaction document.
+    """
+    if not isinstance(response_data, dict):
+        return {}
+    summary = {
+        "zenopay_status": response_data.get("status"),
+        "zenopay_resultcode": response_data.get("resultcode"),
+        "zenopay_message": response_data.get("message"),
+    }
+    return {k: v for k, v in summary.items() if v is not None}
+
+def archive_zenopay_payload(order_id, kind, payload, batch=None):
+    """
+    ✅ Store a raw Zenopay payload, zlib-compressed, in the
+    `zenopay_payloads` side collection instead of on the transaction.
+    Pass a Firestore batch to group archive writes with other updates.
+    """
+    try:
+        archive_ref = firebase_db.collection("zenopay_payloads").document()
+        archive_data = {
+            "order_id": order_id,
+            "kind": kind,
+            "encoding": "zlib+json",
+            "payload": zlib.compress(json.dumps(payload, default=str).encode("utf-8")),
+            "archived_at": firestore.SERVER_TIMESTAMP,
+        }
+        if batch is not None:
+            batch.set(archive_ref, archive_data)
+        else:
+            archive_ref.set(archive_data)
+    except Exception as e:
+        print(f"🔥 Error archiving {kind} payload for {order_id}: {e}")
+
 def update_booking_status(order_id, status_data):
     """
     ✅ Update transaction status directly in Firestore.
@@ -63,10 +102,11 @@ def update_booking_status(order_id, status_data):
     except Exception as e:
         print(f"🔥 Error updating Firestore transaction {order_id}: {e}")
 
-def query_zenopay_payment_status(order_id):
+def query_zenopay_payment_status(order_id, include_details=False):
     """
     ✅ Query Zenopay API manually and return payment result.
     Also updates Firestore with fallback status and transid if available.
+    The raw `details` list is only returned on request.
     """
     ZENOPAY_API_KEY = os.getenv("ZENOPAY_API_KEY")
     url = f"https://zenoapi.com/api/payments/order-status?order_id={order_id}"
@@ -113,19 +153,120 @@ def query_zenopay_payment_status(order_id):
         firebase_db.collection('transactions').document(order_id).update(update_data)
         print(f"✅ Fallback update for {order_id} → {normalized_status}")
 
-        return {
+        result = {
             "order_id": order_id,
             "status": normalized_status,
             "transid": transid,
             "confirmation_code": code,
             "payment_method": method,
             "channel": channel,
-            "details": details
         }
+        if include_details:
+            result["details"] = details
+        return result
 
     except requests.exceptions.Timeout:
         print(f"⏳ Timeout while checking status for {order_id}")
         return {"order_id": order_id, "status": "UNKNOWN", "error": "Timeout"}
     except requests.exceptions.RequestException as e:
         print(f"❌ Request error while checking status for {order_id}: {e}")
-        return {"order_id": order_id, "status": "UNKNOWN", "error": str(e)}
\ No newline at end of file
+        return {"order_id": order_id, "status": "UNKNOWN", "error": str(e)}
+
+# 🎟️ Voucher inventory counters
+# Each (package, network) pair has a parent doc in `voucher_inventory` and a
+# `shards` subcollection. Writers bump one random shard so concurrent imports
+# and assignments don't contend on a single document; readers sum the shards.
+# Counters only exist once `rebuild_voucher_inventory` has built them (it sets
+# `rebuilt_at` on the parent doc). Vouchers written to Firestore outside
+# `import_vouchers` are not counted, so a zero count is confirmed against
+# `vouchers` before a payment is refused.
+VOUCHER_INVENTORY_SHARDS = int(os.getenv("VOUCHER_INVENTORY_SHARDS", "10"))
+
+
+def voucher_inventory_key(package, network):
+    # Hash the pair so client-supplied values can't produce invalid, reserved
+    # or colliding document ids; package/network live on the parent doc.
+    pair = json.dumps([package, network])
+    return hashlib.sha256(pair.encode("utf-8")).hexdigest()
+
+
+def _built_inventory_ref(package, network):
+    inventory_ref = firebase_db.collection("voucher_inventory").document(
+        voucher_inventory_key(package, network)
+    )
+    inventory_doc = inventory_ref.get()
+    if not inventory_doc.exists or not (inventory_doc.to_dict() or {}).get("rebuilt_at"):
+        return None
+    return inventory_ref
+
+
+def adjust_voucher_inventory(package, network, delta):
+    """
+    ✅ Increment (import) or decrement (assignment) the available voucher
+    counter for a package/network pair. Pairs without a built counter are
+    left alone; returns True if a shard was updated.
+    """
+    try:
+        inventory_ref = _built_inventory_ref(package, network)
+        if inventory_ref is None:
+            print(f"⚠️ No voucher inventory counter for {package}/{network}, skipping adjust")
+            return False
+
+        shard_id = str(random.randrange(VOUCHER_INVENTORY_SHARDS))
+        inventory_ref.collection("shards").document(shard_id).set(
+            {"count": firestore.Increment(delta)}, merge=True
+        )
+        return True
+    except Exception as e:
+        print(f"🔥 Error adjusting voucher inventory for {package}/{network}: {e}")
+        return False
+
+
+def get_voucher_inventory(package, network):
+    """
+    ✅ Return the available voucher count for a package/network pair,
+    or None if no counter has been built for it yet.
+    """
+    inventory_ref = _built_inventory_ref(package, network)
+    if inventory_ref is None:
+        return None
+
+    total = sum(
+        (shard.to_dict() or {}).get("count", 0)
+        for shard in inventory_ref.collection("shards").stream()
+    )
+    return max(total, 0)
+
+
+def has_available_voucher(package, network):
+    """
+    ✅ Confirm directly against `vouchers` that at least one voucher is available.
+    """
+    voucher_query = firebase_db.collection("vouchers")\
+        .where("status", "==", "available")\
+        .where("package", "==", package)\
+        .where("network", "==", network)\
+        .limit(1)\
+        .stream()
+    return next(voucher_query, None) is not None
+
+
+def list_voucher_inventory():
+    """
+    ✅ Return available counts for every package/network pair with a counter.
+    """
+    inventory = []
+    for doc in firebase_db.collection("voucher_inventory").stream():
+        data = doc.to_dict() or {}
+        if not data.get("rebuilt_at"):
+            continue
+        total = sum(
+            (shard.to_dict() or {}).get("count", 0)
+            for shard in doc.reference.collection("shards").stream()
+        )
+        inventory.append({
+            "package": data.get("package"),
+            "network": data.get("network"),
+            "available": max(total, 0),
+        })
+    return inventory
@@ -7,7 +7,16 @@ from django.views.decorators.csrf import csrf_exempt
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.http import JsonResponse
-from .utils import update_booking_status, query_zenopay_payment_status
+from .utils import (
+    update_booking_status,
+    query_zenopay_payment_status,
+    adjust_voucher_inventory,
+    get_voucher_inventory,
+    has_available_voucher,
+    list_voucher_inventory,
+    summarize_zenopay_response,
+    archive_zenopay_payload,
+)
 import firebase_admin
 from firebase_admin import credentials, firestore
 from firebase_admin import auth
@@ -48,6 +57,26 @@ def initiate_zenopay_payment(request):
         except (ValueError, TypeError):
             return Response({"error": "Invalid amount"}, status=400)
 
+        # 🎟️ Refuse sold-out packages before charging the customer
+        if package and network:
+            try:
+                sold_out = get_voucher_inventory(package, network) == 0
+                # Vouchers added outside import_vouchers aren't counted, so confirm before refusing
+                if sold_out and has_available_voucher(package, network):
+                    print(f"⚠️ Inventory counter drifted for {package}/{network}, run rebuild_voucher_inventory")
+                    sold_out = False
+            except Exception as e:
+                print(f"⚠️ Inventory lookup failed for {package}/{network}, allowing payment: {e}")
+                sold_out = False
+            if sold_out:
+                print(f"⛔ Sold out: package={package}, network={network}")
+                return Response({
+                    "error": "Package sold out",
+                    "package": package,
+                    "network": network,
+                    "available": 0
+                }, status=409)
+
         order_id = str(uuid.uuid4())
 
         db.collection('transactions').document(order_id).set({
@@ -93,18 +122,21 @@ def initiate_zenopay_payment(request):
             response_data = {"raw_response": res.text}
 
         if res.status_code != 200:
+            archive_zenopay_payload(order_id, "initiate_error", response_data)
             db.collection('transactions').document(order_id).update({
                 "status": "FAILED",
-                "error": response_data
+                "error_status_code": res.status_code,
+                **summarize_zenopay_response(response_data)
             })
             return Response({
                 "error": f"Zenopay returned {res.status_code}",
                 "response": response_data
             }, status=res.status_code)
 
+        archive_zenopay_payload(order_id, "initiate", response_data)
         db.collection('transactions').document(order_id).update({
             "status": "PENDING",
-            "zenopay_response": response_data
+            **summarize_zenopay_response(response_data)
         })
 
         return Response({
@@ -182,6 +214,10 @@ def zenopay_webhook(request):
             package = transaction_data.get("package")
             network = transaction_data.get("network")
 
+            if transaction_data.get("assigned_voucher"):
+                print(f"🔁 Order {order_id} already has voucher {transaction_data.get('assigned_voucher')}, skipping")
+                return Response({"status": "received", "order_id": order_id})
+
             voucher_query = db.collection('vouchers')\
                 .where('status', '==', 'available')\
                 .where('package', '==', package)\
@@ -207,6 +243,8 @@ def zenopay_webhook(request):
                     'assigned_at': firestore.SERVER_TIMESTAMP
                 })
 
+                adjust_voucher_inventory(package, network, -1)
+
                 print(f"🎁 Voucher {voucher_code} assigned to {customer_id}")
             else:
                 print(f"⚠️ No available voucher for package={package}, network={network}")
@@ -221,9 +259,30 @@ def zenopay_webhook(request):
 # ✅ Step 3: Manual Status Check
 @api_view(['GET'])
 def check_zenopay_status(request, order_id):
-    result = query_zenopay_payment_status(order_id)
+    result = query_zenopay_payment_status(order_id, include_details=True)
     return JsonResponse(result)
 
+# ✅ Voucher Inventory
+@api_view(['GET'])
+def voucher_inventory(request):
+    package = request.query_params.get("package")
+    network = request.query_params.get("network")
+
+    try:
+        if package and network:
+            available = get_voucher_inventory(package, network)
+            return Response({
+                "package": package,
+                "network": network,
+                "available": available,
+                "sold_out": available is not None and available <= 0
+            })
+
+        return Response({"inventory": list_voucher_inventory()})
+    except Exception as e:
+        print("🔥 Inventory error:", str(e))
+        return Response({"error": str(e)}, status=500)
+
 
 
 